@@ -9,30 +9,118 @@ assigns an `owner_team` to vulnerability findings using this precedence:
 - Default owner team
 
 Exports a single `assign(finding)` function and a `assign_all(records)` helper.
+`compile_rules(rules)` builds the lookup maps and keyword matchers once so
+batches reuse them; `assign(finding, rules)` recompiles on every call, which
+costs milliseconds with a full rules file (more without pyahocorasick), so
+prefer `assign_all`/`iter_assign` for anything beyond one-off lookups.
+`iter_findings`/`iter_assign`/`write_assignments` stream large exports.
 """
 from __future__ import annotations
 
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import pickle
+import re
+import shutil
+import sys
 import yaml
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Any, NamedTuple, Optional, Tuple
+
+# optional: a single-pass multi-keyword matcher; a compiled regex union otherwise
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# optional: incremental JSON parsing so large exports are never loaded whole
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# what iter_findings/iter_assign raise for malformed or unsupported input
+INPUT_ERRORS: Tuple[type, ...] = (ValueError,) if ijson is None else (ValueError, ijson.JSONError)
+
+# prefer the libyaml-backed loader; fall back to pure Python when unavailable
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+
+def _cache_path(path: Path) -> Path:
+    return path.with_name(path.name + ".cache.json")
+
+
+def _json_payload(rules: Dict[str, Any]) -> Optional[str]:
+    # None unless JSON reproduces the rules exactly (int keys, timestamps, sets do not)
+    try:
+        payload = json.dumps(rules)
+    except (TypeError, ValueError):
+        return None
+    return payload if json.loads(payload) == rules else None
 
 
 def load_rules(path: Path) -> Dict[str, Any]:
-    with path.open("r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+    """Load routing rules, reusing a JSON sidecar cache when the YAML is unchanged.
+
+    The sidecar (`<rules>.cache.json`) is keyed by the SHA-1 of the YAML bytes;
+    any mismatch or unreadable cache falls back to parsing the YAML. Rules that
+    JSON cannot represent exactly are recorded as not cacheable and always
+    parsed from the YAML, so callers get the same value either way.
+    """
+    raw = path.read_bytes()
+    digest = hashlib.sha1(raw).hexdigest()
+    cache = _cache_path(path)
+    cacheable = True
+    try:
+        with cache.open("r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if isinstance(cached, dict) and cached.get("_v") == digest:
+            if "rules" in cached:
+                return cached["rules"] or {}
+            cacheable = False
+    except (OSError, ValueError):
+        pass
+
+    rules = yaml.load(raw, Loader=_Loader) or {}
+    if not cacheable:
+        return rules
+
+    payload = _json_payload(rules)
+    if payload is None:
+        entry = json.dumps({"_v": digest, "cacheable": False})
+    else:
+        entry = f'{{"_v": {json.dumps(digest)}, "rules": {payload}}}'
+
+    # write atomically; caching is best-effort (e.g. read-only dirs)
+    tmp = cache.with_name(f"{cache.name}.{os.getpid()}.tmp")
+    try:
+        with tmp.open("w", encoding="utf-8") as f:
+            f.write(entry)
+        os.replace(tmp, cache)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+    return rules
 
 
-def _get_plugin_id(finding: Dict[str, Any]) -> Optional[str]:
+def _get_plugin_id(finding: Dict[str, Any]) -> Any:
+    # returned as stored (usually int); CompiledRules.owner_for_pid handles any type
     plugin = finding.get("plugin")
     if isinstance(plugin, dict):
         pid = plugin.get("id")
         if pid is not None:
-            return str(pid)
+            return pid
     # fallback top-level names
-    pid = finding.get("plugin_id") or finding.get("pluginId")
-    if pid is not None:
-        return str(pid)
-    return None
+    return finding.get("plugin_id") or finding.get("pluginId")
 
 
 def _get_family(finding: Dict[str, Any]) -> str:
@@ -42,87 +130,421 @@ def _get_family(finding: Dict[str, Any]) -> str:
     return finding.get("plugin_family") or finding.get("family") or ""
 
 
-def _get_field_text(finding: Dict[str, Any], field: str) -> str:
-    # support dot notation like 'evidence.output'
-    parts = field.split(".")
-    cur: Any = finding
-    for p in parts:
-        if isinstance(cur, dict) and p in cur:
-            cur = cur[p]
-        else:
-            # support plugin_name -> plugin.name
-            if field == "plugin_name":
-                plug = finding.get("plugin")
-                if isinstance(plug, dict):
-                    return str(plug.get("name") or plug.get("plugin") or "")
-            return ""
-    if isinstance(cur, list):
-        return " ".join(str(x) for x in cur)
-    return str(cur or "")
+def _plugin_name_fallback(finding: Dict[str, Any]) -> str:
+    # support plugin_name -> plugin.name
+    plug = finding.get("plugin")
+    if isinstance(plug, dict):
+        return str(plug.get("name") or plug.get("plugin") or "")
+    return ""
 
 
-def assign(finding: Dict[str, Any], rules: Dict[str, Any]) -> Dict[str, Any]:
-    """Assign an owner_team to a single finding and return a dict with metadata."""
-    default = rules.get("default_owner_team") or "vm-triage"
+def _compile_field(field: str) -> Callable[[Dict[str, Any]], str]:
+    """Return an accessor for `field`, splitting dot notation like 'evidence.output' once."""
+    parts = tuple(field.split("."))
+    fallback = _plugin_name_fallback if field == "plugin_name" else None
+
+    def get_text(finding: Dict[str, Any]) -> str:
+        cur: Any = finding
+        for p in parts:
+            if isinstance(cur, dict) and p in cur:
+                cur = cur[p]
+            else:
+                return fallback(finding) if fallback else ""
+        if isinstance(cur, list):
+            return " ".join(str(x) for x in cur)
+        return str(cur or "")
+
+    return get_text
+
+
+# (kw_rules index, position of the field in that rule's `fields`)
+_Hit = Tuple[int, int]
+
+
+class CompiledRules(NamedTuple):
+    """Lookup structures derived once from a rules dict (see `compile_rules`)."""
+
+    pid_map: Dict[str, str]
+    # the integer-form keys of pid_map, so int plugin ids skip str()
+    pid_map_int: Dict[int, str]
+    family_map: Dict[str, str]
+    # (keyword, owner, weight, fields)
+    kw_rules: Tuple[Tuple[str, Optional[str], int, Tuple[str, ...]], ...]
+    # keyword owners sorted by name; scores are kept in a list indexed by position
+    owners: Tuple[Optional[str], ...]
+    # owners index of each kw_rules entry's owner
+    kw_owner_ids: Tuple[int, ...]
+    # (field, accessor returning its text, matcher returning the keyword hits in that text)
+    field_matchers: Tuple[Tuple[str, Callable[[Dict[str, Any]], str], Callable[[str], List[_Hit]]], ...]
+    default: str
 
-    # build lookup maps
+    def owner_for_pid(self, pid: Any) -> Optional[str]:
+        """Owner for a plugin id, matching on its string form like the rules do."""
+        if type(pid) is int:
+            return self.pid_map_int.get(pid)
+        if pid is None:
+            return None
+        return self.pid_map.get(str(pid))
+
+
+def _build_matcher(entries: List[Tuple[str, _Hit]]) -> Callable[[str], List[_Hit]]:
+    """Return a function listing the hits whose keyword occurs in a lowercased text.
+
+    Each hit is reported at most once, however often its keyword occurs.
+    """
+    by_kw: Dict[str, List[_Hit]] = {}
+    for kw, hit in entries:
+        by_kw.setdefault(kw, []).append(hit)
+    # '' is a substring of every text; automata cannot hold empty words
+    always = by_kw.pop("", [])
+
+    if ahocorasick is not None and by_kw:
+        automaton = ahocorasick.Automaton()
+        for kw, hits in by_kw.items():
+            automaton.add_word(kw, (kw, hits))
+        automaton.make_automaton()
+
+        def match(text: str) -> List[_Hit]:
+            # iter() yields every occurrence; keep one entry per keyword
+            found = {kw: hits for _, (kw, hits) in automaton.iter(text)}
+            out = list(always)
+            for hits in found.values():
+                out.extend(hits)
+            return out
+    elif by_kw:
+        # Zero-width lookahead tests every offset; longest-first alternation
+        # yields the longest keyword starting there, and the shorter keywords
+        # that also match at that offset are exactly its prefixes.
+        ordered = sorted(by_kw, key=lambda k: (-len(k), k))
+        pattern = re.compile("(?=(" + "|".join(map(re.escape, ordered)) + "))")
+        # probe each keyword's own prefixes against the set: O(K * len) not O(K^2)
+        known = set(ordered)
+        prefixes = {kw: tuple(kw[:n] for n in range(len(kw), 0, -1) if kw[:n] in known) for kw in ordered}
+
+        def match(text: str) -> List[_Hit]:
+            found = {k: by_kw[k] for m in pattern.finditer(text) for k in prefixes[m.group(1)]}
+            out = list(always)
+            for hits in found.values():
+                out.extend(hits)
+            return out
+    else:
+
+        def match(text: str) -> List[_Hit]:
+            return list(always)
+
+    return match
+
+
+def _intern(value: Any) -> Any:
+    # owner and family names are small closed sets used as dict keys; share one object each
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def compile_rules(rules: Dict[str, Any]) -> CompiledRules:
+    """Build the lookup maps used by the assignment precedence chain."""
     pid_map = {str(item.get("plugin_id")): item.get("owner_team") for item in rules.get("plugin_id_rules", [])}
     family_map = {item.get("family"): item.get("owner_team") for item in rules.get("family_rules", [])}
+    # drop empty keys/owners after last-wins dedup so a plain .get() is a match test
+    pid_map = {k: _intern(v) for k, v in pid_map.items() if k and v}
+    family_map = {_intern(k): _intern(v) for k, v in family_map.items() if k and v}
+    # '100' and 100 share a key above; only canonical digit strings round-trip
+    pid_map_int = {}
+    for k, v in pid_map.items():
+        try:
+            n = int(k)
+        except ValueError:
+            continue
+        if str(n) == k:
+            pid_map_int[n] = v
+    kw_rules = tuple(
+        (
+            (k.get("keyword") or "").lower(),
+            _intern(k.get("owner_team")),
+            int(k.get("weight") or 0),
+            tuple(k.get("fields") or ["plugin_name"]),
+        )
+        for k in rules.get("keyword_rules", [])
+    )
+
+    # index order matches name order, so comparing indices breaks ties like names
+    owners = tuple(sorted({kr[1] for kr in kw_rules}, key=lambda o: (o is not None, o or "")))
+    owner_id = {owner: n for n, owner in enumerate(owners)}
+    kw_owner_ids = tuple(owner_id[kr[1]] for kr in kw_rules)
+
+    # invert rules -> fields so each field is fetched and scanned once per finding
+    per_field: Dict[str, List[Tuple[str, _Hit]]] = {}
+    for i, (kw, _owner, _weight, fields) in enumerate(kw_rules):
+        for j, field in enumerate(fields):
+            per_field.setdefault(field, []).append((kw, (i, j)))
+    field_matchers = tuple(
+        (field, _compile_field(field), _build_matcher(entries)) for field, entries in per_field.items()
+    )
+
+    return CompiledRules(
+        pid_map=pid_map,
+        pid_map_int=pid_map_int,
+        family_map=family_map,
+        kw_rules=kw_rules,
+        owners=owners,
+        kw_owner_ids=kw_owner_ids,
+        field_matchers=field_matchers,
+        default=rules.get("default_owner_team") or "vm-triage",
+    )
 
-    # keyword rules list
-    kw_rules = []
-    for k in rules.get("keyword_rules", []):
-        kw_rules.append({
-            "keyword": (k.get("keyword") or "").lower(),
-            "owner": k.get("owner_team"),
-            "weight": int(k.get("weight") or 0),
-            "fields": k.get("fields") or ["plugin_name"],
-        })
 
+def _leader(scores: List[int], matched: Iterable[int]) -> Tuple[int, int]:
+    """Highest-scoring matched owner index, ties going to the greater index (name)."""
+    best, best_score = -1, 0
+    for owner in matched:
+        score = scores[owner]
+        if best < 0 or score > best_score or (score == best_score and owner > best):
+            best, best_score = owner, score
+    return best, best_score
+
+
+def _assign(finding: Dict[str, Any], compiled: CompiledRules) -> Dict[str, Any]:
     # 1) plugin_id match
     pid = _get_plugin_id(finding)
-    if pid and pid in pid_map and pid_map[pid]:
-        return {"owner_team": pid_map[pid], "reason": f"plugin_id:{pid}"}
+    owner = compiled.owner_for_pid(pid)
+    if owner:
+        return {"owner_team": owner, "reason": f"plugin_id:{pid}"}
 
     # 2) family match
     fam = _get_family(finding)
-    if fam and fam in family_map and family_map[fam]:
-        return {"owner_team": family_map[fam], "reason": f"family:{fam}"}
+    owner = compiled.family_map.get(fam)
+    if owner:
+        return {"owner_team": owner, "reason": f"family:{fam}"}
+
+    return _assign_keywords(finding, compiled)
 
+
+def _assign_keywords(finding: Dict[str, Any], compiled: CompiledRules) -> Dict[str, Any]:
     # 3) keyword scoring
-    scores: Dict[str, int] = {}
-    matches: List[str] = []
-    for kr in kw_rules:
-        kw = kr["keyword"]
-        for field in kr["fields"]:
-            text = _get_field_text(finding, field).lower()
-            if not text:
-                continue
-            if kw in text:
-                scores[kr["owner"]] = scores.get(kr["owner"], 0) + kr["weight"]
-                matches.append(f"{kr['owner']}:+{kr['weight']}({kw})")
-
-    if scores:
+    kw_rules = compiled.kw_rules
+    kw_owner_ids = compiled.kw_owner_ids
+    hits: List[_Hit] = []
+    scores = [0] * len(compiled.owners)
+    # only owners with a hit compete, as they did when scores was a dict
+    matched = set()
+    for _field, get_text, match in compiled.field_matchers:
+        text = get_text(finding).lower()
+        if not text:
+            continue
+        found = match(text)
+        for i, _ in found:
+            owner = kw_owner_ids[i]
+            scores[owner] += kw_rules[i][2]
+            matched.add(owner)
+        hits.extend(found)
+
+    if matched:
+        # list matches in rule/field order, as the rules file declares them
+        hits.sort()
+        matches = [f"{owner}:+{weight}({kw})" for kw, owner, weight, _ in (kw_rules[i] for i, _ in hits)]
         # choose owner with max score
-        best_owner = max(scores.items(), key=lambda x: (x[1], x[0]))[0]
+        best_owner = compiled.owners[_leader(scores, matched)[0]]
         return {"owner_team": best_owner, "reason": f"keywords: {';'.join(matches)}"}
 
     # fallback default
-    return {"owner_team": default, "reason": "default"}
+    return {"owner_team": compiled.default, "reason": "default"}
 
 
-def assign_all(records: List[Dict[str, Any]], rules: Dict[str, Any]) -> List[Dict[str, Any]]:
-    out = []
-    for r in records:
-        assigned = assign(r, rules)
-        rec = {"finding_id": r.get("finding_id") or r.get("id"), "owner_team": assigned["owner_team"], "reason": assigned["reason"]}
-        out.append(rec)
+def assign(finding: Dict[str, Any], rules: Dict[str, Any]) -> Dict[str, Any]:
+    """Assign an owner_team to a single finding and return a dict with metadata.
+
+    Compiles `rules` (maps and keyword matchers) on every call, so each call
+    costs far more than the lookup itself; use `assign_all` for batches.
+    """
+    return _assign(finding, compile_rules(rules))
+
+
+def _assign_batch(records: List[Dict[str, Any]], compiled: CompiledRules) -> List[Dict[str, Any]]:
+    # Work column-wise: the plugin_id and family stages are a map() of a lookup
+    # over one column each, and only rows left unresolved by both are scored
+    # per row. Results are written back by index, keeping the input order.
+    pids = list(map(_get_plugin_id, records))
+    owners: List[Optional[str]] = list(map(compiled.owner_for_pid, pids))
+    reasons = [f"plugin_id:{pid}" if owner else "" for pid, owner in zip(pids, owners)]
+
+    todo = [i for i, owner in enumerate(owners) if not owner]
+    fams = [_get_family(records[i]) for i in todo]
+    rest = []
+    for i, fam, owner in zip(todo, fams, map(compiled.family_map.get, fams)):
+        if owner:
+            owners[i] = owner
+            reasons[i] = f"family:{fam}"
+        else:
+            rest.append(i)
+
+    for i in rest:
+        assigned = _assign_keywords(records[i], compiled)
+        owners[i] = assigned["owner_team"]
+        reasons[i] = assigned["reason"]
+
+    return [
+        {"finding_id": r.get("finding_id") or r.get("id"), "owner_team": owner, "reason": reason}
+        for r, owner, reason in zip(records, owners, reasons)
+    ]
+
+
+# below this many records the cost of pickling rows to workers outweighs the gain
+PARALLEL_MIN_RECORDS = 50_000
+
+_worker_compiled: Optional[CompiledRules] = None
+
+
+def _init_worker(rules: Dict[str, Any]) -> None:
+    # CompiledRules holds closures and cannot be pickled; compile per worker
+    global _worker_compiled
+    _worker_compiled = compile_rules(rules)
+
+
+def _assign_chunk(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return _assign_batch(records, _worker_compiled)
+
+
+def _can_send_to_workers() -> bool:
+    # workers look `_assign_chunk` up by module name; a module loaded straight
+    # from a file path (as tools/assign.py does) is not importable that way
+    try:
+        pickle.dumps(_assign_chunk)
+    except (pickle.PicklingError, AttributeError, ImportError):
+        return False
+    return True
+
+
+def assign_all(
+    records: List[Dict[str, Any]], rules: Dict[str, Any], processes: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Assign every record, in input order.
+
+    Runs in-process unless `processes` > 1 is given, in which case batches of at
+    least `PARALLEL_MIN_RECORDS` are split across a pool of that many workers.
+    Callers opting in under the spawn/forkserver start methods need the usual
+    `if __name__ == "__main__":` guard. Falls back to in-process when this
+    module cannot be re-imported by name in the workers.
+    """
+    records = list(records)
+    if (
+        processes is None
+        or processes <= 1
+        or len(records) < PARALLEL_MIN_RECORDS
+        or not _can_send_to_workers()
+    ):
+        return _assign_batch(records, compile_rules(rules))
+
+    size = max(64, len(records) // (processes * 4))
+    chunks = [records[i:i + size] for i in range(0, len(records), size)]
+    out: List[Dict[str, Any]] = []
+    with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(rules,)) as pool:
+        for part in pool.imap(_assign_chunk, chunks):
+            out.extend(part)
     return out
 
 
+def iter_assign(
+    records: Iterable[Dict[str, Any]], rules: Dict[str, Any], batch_size: int = 1024
+) -> Iterator[Dict[str, Any]]:
+    """Like `assign_all`, but consumes `records` lazily and yields results in order."""
+    compiled = compile_rules(rules)
+    it = iter(records)
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            return
+        yield from _assign_batch(batch, compiled)
+
+
+def iter_findings(fh: IO[bytes]) -> Iterator[Dict[str, Any]]:
+    """Iterate findings from a JSON list or `{"findings": [...]}` opened in binary mode.
+
+    Streams with ijson when installed, otherwise loads the document with `json`.
+    Raises ValueError for any other top-level shape (possibly only once iterated).
+    """
+    if ijson is None:
+        data = json.load(fh)
+        if isinstance(data, dict) and "findings" in data:
+            return iter(data["findings"])
+        if isinstance(data, list):
+            return iter(data)
+        raise ValueError("Unsupported input format")
+
+    # peek at the first significant byte to pick the item prefix; pipes and
+    # process substitution cannot seek, so only leading whitespace is consumed
+    if not hasattr(fh, "peek"):
+        fh = io.BufferedReader(fh)
+    head = fh.peek(1)
+    while head:
+        stripped = head.lstrip(b" \t\r\n")
+        if stripped:
+            head = stripped[:1]
+            break
+        fh.read(len(head))
+        head = fh.peek(1)
+    if head.startswith(b"["):
+        return ijson.items(fh, "item", use_float=True)
+    if head.startswith(b"{"):
+        return _iter_wrapped_findings(fh)
+    raise ValueError("Unsupported input format")
+
+
+def _iter_wrapped_findings(fh: IO[bytes]) -> Iterator[Dict[str, Any]]:
+    # an object without a `findings` array yields no items, so raising at the
+    # end still happens before any output has been written
+    seen = False
+
+    def events() -> Iterator[Tuple[str, str, Any]]:
+        nonlocal seen
+        for prefix, event, value in ijson.parse(fh, use_float=True):
+            if prefix == "findings" and event == "start_array":
+                seen = True
+            yield prefix, event, value
+
+    yield from ijson.items(events(), "findings.item")
+    if not seen:
+        raise ValueError("Unsupported input format")
+
+
+def write_assignments(fh: IO[str], assigned: Iterable[Dict[str, Any]]) -> None:
+    """Write records incrementally, byte-identical to `json.dump(list(assigned), fh, indent=2)`."""
+    first = True
+    for rec in assigned:
+        fh.write("[\n  " if first else ",\n  ")
+        fh.write(json.dumps(rec, indent=2).replace("\n", "\n  "))
+        first = False
+    fh.write("[]" if first else "\n]")
+
+
+def write_assignments_file(path: Path, assigned: Iterable[Dict[str, Any]]) -> None:
+    """Write records to `path` through a temp file, replacing it only on success.
+
+    Input errors raised while `assigned` is consumed leave an existing file
+    untouched. Symlinks are written through to their target, whose mode is
+    kept; non-regular targets such as /dev/null are written directly.
+    """
+    target = path.resolve()
+    if target.exists() and not target.is_file():
+        with target.open("w", encoding="utf-8", buffering=1 << 20) as fh:
+            write_assignments(fh, assigned)
+        return
+
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    try:
+        with tmp.open("w", encoding="utf-8", buffering=1 << 20) as fh:
+            write_assignments(fh, assigned)
+        if target.exists():
+            shutil.copymode(target, tmp)
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
 if __name__ == "__main__":
     import argparse
-    import json
 
     p = argparse.ArgumentParser()
     p.add_argument("input", nargs="?", default="cache/dummy_tenable_findings.json")
@@ -131,19 +553,14 @@ if __name__ == "__main__":
     args = p.parse_args()
 
     rules = load_rules(Path(args.rules))
-    with open(args.input, "r", encoding="utf-8") as fh:
-        data = json.load(fh)
-    if isinstance(data, dict) and "findings" in data:
-        findings = data["findings"]
-    elif isinstance(data, list):
-        findings = data
-    else:
-        raise SystemExit("Unsupported input format")
-
-    assigned = assign_all(findings, rules)
-    if args.output:
-        with open(args.output, "w", encoding="utf-8") as fh:
-            json.dump(assigned, fh, indent=2)
-        print(f"Wrote assignments to {args.output}")
-    else:
-        print(json.dumps(assigned, indent=2))
+    with open(args.input, "rb") as fh:
+        try:
+            assigned = iter_assign(iter_findings(fh), rules)
+            if args.output:
+                write_assignments_file(Path(args.output), assigned)
+                print(f"Wrote assignments to {args.output}")
+            else:
+                write_assignments(sys.stdout, assigned)
+                print()
+        except INPUT_ERRORS as exc:
+            raise SystemExit(str(exc))
@@ -0,0 +1,343 @@
+"""Tests for the Ownership Assignment Engine."""
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import io
+import json
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PKG_ROOT = Path(__file__).resolve().parents[1]
+
+RULES = {
+    "plugin_id_rules": [{"id": "pid-1", "plugin_id": 100, "owner_team": "Compute-OS"}],
+    "family_rules": [{"id": "fam-1", "family": "Databases", "owner_team": "Database"}],
+    "keyword_rules": [
+        {"id": "kw-1", "keyword": "Apache", "owner_team": "Middleware", "weight": 100, "fields": ["plugin_name"]},
+        {"id": "kw-2", "keyword": "SSH", "owner_team": "Compute-OS", "weight": 80, "fields": ["plugin_name"]},
+    ],
+    "default_owner_team": "vm-triage",
+}
+
+
+def _load_like_assign_cli():
+    # mirrors tools/assign.py: load from the file path without registering in sys.modules
+    spec = importlib.util.spec_from_file_location("ownership_engine", str(PKG_ROOT / "ownership_engine.py"))
+    engine = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(engine)
+    return engine
+
+
+def _records(n: int):
+    names = ["Apache httpd", "OpenSSH SSH server", "Generic check"]
+    out = []
+    for i in range(n):
+        plugin = {"id": 100 if i % 5 == 0 else i, "name": names[i % 3], "family": "Databases" if i % 7 == 0 else "Misc"}
+        out.append({"finding_id": f"f{i}", "plugin": plugin})
+    return out
+
+
+class AssignAllProcessesTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = _load_like_assign_cli()
+        self.engine.PARALLEL_MIN_RECORDS = 10
+        self.records = _records(200)
+        self.expected = [
+            {"finding_id": r["finding_id"], **self.engine.assign(r, RULES)} for r in self.records
+        ]
+
+    def test_default_is_serial_and_matches_assign(self):
+        self.assertEqual(self.engine.assign_all(self.records, RULES), self.expected)
+
+    def test_processes_with_path_loaded_module_falls_back(self):
+        self.assertFalse(self.engine._can_send_to_workers())
+        self.assertEqual(self.engine.assign_all(self.records, RULES, processes=2), self.expected)
+
+    def test_processes_with_package_import_uses_pool(self):
+        if str(PKG_ROOT.parent) not in sys.path:
+            sys.path.insert(0, str(PKG_ROOT.parent))
+            self.addCleanup(sys.path.remove, str(PKG_ROOT.parent))
+        engine = importlib.import_module("vulnerbaility_assignment.ownership_engine")
+        self.assertTrue(engine._can_send_to_workers())
+        pool = mock.patch.object(engine.multiprocessing, "Pool", wraps=engine.multiprocessing.Pool)
+        with mock.patch.object(engine, "PARALLEL_MIN_RECORDS", 10), pool as spy:
+            parallel = engine.assign_all(self.records, RULES, processes=2)
+        spy.assert_called_once()
+        self.assertEqual(parallel, engine.assign_all(self.records, RULES, processes=1))
+        self.assertEqual(parallel, self.expected)
+
+
+SMB_RULES = [
+    {"keyword": "smb sign", "owner_team": "Windows", "weight": 30, "fields": ["plugin_name"]},
+    {"keyword": "SMB", "owner_team": "Network", "weight": 20, "fields": ["plugin_name"]},
+    {"keyword": "b s", "owner_team": "Storage", "weight": 5, "fields": ["plugin_name"]},
+    {"keyword": "signing", "owner_team": "Network", "weight": 15, "fields": ["plugin_name"]},
+    {"keyword": "", "owner_team": "Catch-all", "weight": 1, "fields": ["plugin_name"]},
+]
+
+# (rules, finding, expected owner_team, expected reason); expectations match the
+# original per-rule substring loop
+KEYWORD_CASES = [
+    (
+        # every match is listed, even once one owner has an unbeatable lead
+        {"keyword_rules": [
+            {"keyword": "Apache", "owner_team": "Middleware", "weight": 100, "fields": ["plugin_name", "description"]},
+            {"keyword": "Tomcat", "owner_team": "Middleware", "weight": 90, "fields": ["plugin_name", "description"]},
+            {"keyword": "SSH", "owner_team": "Compute-OS", "weight": 40, "fields": ["description"]},
+        ]},
+        {"plugin": {"name": "Apache Tomcat"}, "description": "apache over ssh"},
+        "Middleware",
+        "keywords: Middleware:+100(apache);Middleware:+100(apache);Middleware:+90(tomcat);Compute-OS:+40(ssh)",
+    ),
+    (
+        # a negative weight in a later field can still drop the leader
+        {"keyword_rules": [
+            {"keyword": "tls", "owner_team": "A", "weight": 2, "fields": ["plugin_name"]},
+            {"keyword": "ope", "owner_team": "A", "weight": -1, "fields": ["plugin_name"]},
+            {"keyword": "cert", "owner_team": "A", "weight": -50, "fields": ["description"]},
+            {"keyword": "tls", "owner_team": "B", "weight": 1, "fields": ["description"]},
+        ]},
+        {"plugin": {"name": "TLS openssl"}, "description": "tls cert expired"},
+        "B",
+        "keywords: A:+2(tls);A:+-1(ope);A:+-50(cert);B:+1(tls)",
+    ),
+    (
+        # a keyword shared by two rules hits each once per field, however often it occurs
+        {"keyword_rules": [
+            {"keyword": "ssh", "owner_team": "Compute-OS", "weight": 10, "fields": ["plugin_name", "description"]},
+            {"keyword": "ssh", "owner_team": "Network", "weight": 10, "fields": ["description"]},
+            {"keyword": "openssh", "owner_team": "Network", "weight": 1, "fields": ["evidence.output"]},
+        ]},
+        {"plugin": {"name": "OpenSSH"}, "description": "ssh ssh", "evidence": {"output": ["OpenSSH_8.9", "x"]}},
+        "Compute-OS",
+        "keywords: Compute-OS:+10(ssh);Compute-OS:+10(ssh);Network:+10(ssh);Network:+1(openssh)",
+    ),
+    (
+        # overlapping keywords at one offset: 'smb' is a prefix of the longer 'smb sign'
+        # the lookahead reports, and 'b s' starts inside it
+        {"keyword_rules": SMB_RULES},
+        {"plugin": {"name": "SMB Signing not required"}},
+        "Network",
+        "keywords: Windows:+30(smb sign);Network:+20(smb);Storage:+5(b s);Network:+15(signing);Catch-all:+1()",
+    ),
+    (
+        {"keyword_rules": SMB_RULES},
+        {"plugin": {"name": "smb smb smb"}},
+        "Network",
+        "keywords: Network:+20(smb);Storage:+5(b s);Catch-all:+1()",
+    ),
+    (
+        # an empty keyword matches every text
+        {"keyword_rules": SMB_RULES},
+        {"plugin": {"name": "nothing"}},
+        "Catch-all",
+        "keywords: Catch-all:+1()",
+    ),
+]
+
+
+class KeywordScoringTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = _load_like_assign_cli()
+
+    def _check(self, cases):
+        for n, (rules, finding, owner, reason) in enumerate(cases):
+            with self.subTest(case=n):
+                got = self.engine.assign_all([dict(finding, finding_id=f"f{n}")], rules)
+                self.assertEqual(got, [{"finding_id": f"f{n}", "owner_team": owner, "reason": reason}])
+
+    def test_regex_matcher(self):
+        with mock.patch.object(self.engine, "ahocorasick", None):
+            self._check(KEYWORD_CASES)
+
+    def test_ahocorasick_matcher(self):
+        if self.engine.ahocorasick is None:
+            self.skipTest("pyahocorasick not installed")
+        self._check(KEYWORD_CASES)
+
+    def test_matchers_agree_on_bundled_rules(self):
+        if self.engine.ahocorasick is None:
+            self.skipTest("pyahocorasick not installed")
+        import yaml
+
+        with (PKG_ROOT / "Library" / "routing_rules.yaml").open("r", encoding="utf-8") as f:
+            rules = {"keyword_rules": yaml.safe_load(f)["keyword_rules"]}
+        words = [k["keyword"] for k in rules["keyword_rules"]]
+        n = len(words)
+        findings = [
+            {
+                "finding_id": f"f{i}",
+                "plugin": {"name": f"{words[i]} {words[i * 7 % n]}", "family": words[i * 3 % n]},
+                "description": f"{words[i * 13 % n]}-{words[i * 17 % n].upper()}{words[i]}",
+                "evidence": {"output": [words[i * 5 % n], "n/a"]},
+            }
+            for i in range(n)
+        ]
+        automaton = self.engine.assign_all(findings, rules)
+        with mock.patch.object(self.engine, "ahocorasick", None):
+            regex = self.engine.assign_all(findings, rules)
+        self.assertEqual(automaton, regex)
+        self.assertTrue(all(r["reason"].startswith("keywords: ") for r in regex))
+
+
+PID_RULES = {
+    "plugin_id_rules": [
+        {"plugin_id": 100, "owner_team": "Int"},
+        {"plugin_id": "0100", "owner_team": "Padded"},
+        {"plugin_id": True, "owner_team": "Bool"},
+        {"plugin_id": 3.0, "owner_team": "Float"},
+        {"plugin_id": 0, "owner_team": "Zero"},
+        {"plugin_id": "abc", "owner_team": "Str"},
+    ],
+    "default_owner_team": "triage",
+}
+
+# (finding, expected owner_team, expected reason); rule and finding ids match on
+# their str() form, as in the original engine
+PID_CASES = [
+    ({"plugin": {"id": 100}}, "Int", "plugin_id:100"),
+    ({"plugin": {"id": "100"}}, "Int", "plugin_id:100"),
+    ({"plugin": {"id": "0100"}}, "Padded", "plugin_id:0100"),
+    ({"pluginId": "0100"}, "Padded", "plugin_id:0100"),
+    ({"plugin": {"id": 100.0}}, "triage", "default"),
+    ({"plugin": {"id": True}}, "Bool", "plugin_id:True"),
+    ({"plugin": {"id": "True"}}, "Bool", "plugin_id:True"),
+    ({"plugin": {"id": 1}}, "triage", "default"),
+    ({"plugin": {"id": 3.0}}, "Float", "plugin_id:3.0"),
+    ({"plugin": {"id": 3}}, "triage", "default"),
+    ({"plugin": {"id": 0}}, "Zero", "plugin_id:0"),
+    ({"plugin": {"id": "0"}}, "Zero", "plugin_id:0"),
+    # a falsy top-level id falls through to the next lookup
+    ({"plugin_id": 0}, "triage", "default"),
+    ({"plugin": {"id": "abc"}}, "Str", "plugin_id:abc"),
+    ({"plugin": {"id": None}}, "triage", "default"),
+]
+
+
+class PluginIdLookupTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = _load_like_assign_cli()
+
+    def test_plugin_id_cases(self):
+        for n, (finding, owner, reason) in enumerate(PID_CASES):
+            with self.subTest(case=n, finding=finding):
+                got = self.engine.assign_all([dict(finding, finding_id=f"f{n}")], PID_RULES)
+                self.assertEqual(got, [{"finding_id": f"f{n}", "owner_team": owner, "reason": reason}])
+
+    def test_only_canonical_int_keys(self):
+        compiled = self.engine.compile_rules(PID_RULES)
+        self.assertEqual(compiled.pid_map_int, {100: "Int", 0: "Zero"})
+
+
+class WriteAssignmentsFileTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = _load_like_assign_cli()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out = Path(self.tmp.name) / "out.json"
+        self.out.write_text("previous", encoding="utf-8")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_replaces_output_on_success(self):
+        recs = _records(3)
+        self.engine.write_assignments_file(self.out, self.engine.iter_assign(recs, RULES))
+        self.assertEqual(json.loads(self.out.read_text(encoding="utf-8")), self.engine.assign_all(recs, RULES))
+
+    def test_bad_input_keeps_existing_output(self):
+        for payload in (b'{"x": 1}', b'[{"finding_id": "f0", "plugin": {"id": 1'):
+            with self.assertRaises(self.engine.INPUT_ERRORS):
+                assigned = self.engine.iter_assign(self.engine.iter_findings(io.BytesIO(payload)), RULES)
+                self.engine.write_assignments_file(self.out, assigned)
+            self.assertEqual(self.out.read_text(encoding="utf-8"), "previous")
+            self.assertEqual(sorted(p.name for p in self.out.parent.iterdir()), ["out.json"])
+
+    def test_symlink_is_written_through_and_mode_kept(self):
+        os.chmod(self.out, 0o640)
+        link = self.out.with_name("link.json")
+        link.symlink_to(self.out.name)
+        recs = _records(3)
+        self.engine.write_assignments_file(link, self.engine.iter_assign(recs, RULES))
+        self.assertTrue(link.is_symlink())
+        self.assertEqual(json.loads(self.out.read_text(encoding="utf-8")), self.engine.assign_all(recs, RULES))
+        self.assertEqual(stat.S_IMODE(self.out.stat().st_mode), 0o640)
+
+    def test_non_regular_target_is_written_directly(self):
+        devnull = Path(os.devnull)
+        self.engine.write_assignments_file(devnull, self.engine.iter_assign(_records(3), RULES))
+        self.assertTrue(devnull.is_char_device())
+
+
+class _PipeLike(io.RawIOBase):
+    """Readable, non-seekable raw stream, like stdin or a process substitution."""
+
+    def __init__(self, data: bytes):
+        self._data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        return self._data.readinto(b)
+
+
+class IterFindingsTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = _load_like_assign_cli()
+        self.records = _records(5)
+
+    def _findings(self, payload: bytes):
+        fh = io.BufferedReader(_PipeLike(payload))
+        self.assertFalse(fh.seekable())
+        return list(self.engine.iter_findings(fh))
+
+    def test_non_seekable_list_and_wrapped_inputs(self):
+        body = json.dumps(self.records).encode("utf-8")
+        self.assertEqual(self._findings(body), self.records)
+        self.assertEqual(self._findings(b" \n\t" + body), self.records)
+        wrapped = json.dumps({"findings": self.records}).encode("utf-8")
+        self.assertEqual(self._findings(b"\n" * 10000 + wrapped), self.records)
+
+    def test_non_seekable_unsupported_input(self):
+        for payload in (b'  {"x": 1}', b"   ", b"42"):
+            with self.assertRaises(self.engine.INPUT_ERRORS):
+                self._findings(payload)
+
+
+class LoadRulesCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = _load_like_assign_cli()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _load_twice(self, text: str):
+        path = self.dir / "routing_rules.yaml"
+        path.write_text(text, encoding="utf-8")
+        return self.engine.load_rules(path), self.engine.load_rules(path)
+
+    def test_cache_hit_returns_same_rules(self):
+        miss, hit = self._load_twice("default_owner_team: SecOps\nfamily_rules:\n  - {family: Databases, owner_team: Database}\n")
+        self.assertEqual(miss, hit)
+        cached = json.loads((self.dir / "routing_rules.yaml.cache.json").read_text(encoding="utf-8"))
+        self.assertEqual(cached["rules"], miss)
+
+    def test_values_json_cannot_represent_are_not_cached(self):
+        for text in ("meta: {1: b}\n", "generated_at: 2026-02-11\n"):
+            miss, hit = self._load_twice(text)
+            self.assertEqual(miss, hit)
+            cached = json.loads((self.dir / "routing_rules.yaml.cache.json").read_text(encoding="utf-8"))
+            self.assertIs(cached["cacheable"], False)
+            self.assertEqual(sorted(p.name for p in self.dir.iterdir()), ["routing_rules.yaml", "routing_rules.yaml.cache.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import argparse
-import json
+import sys
 from pathlib import Path
 
 import importlib.util
@@ -25,23 +25,18 @@ def main() -> int:
     args = p.parse_args()
 
     rules = engine.load_rules(Path(args.rules))
-    with open(args.input, "r", encoding="utf-8") as fh:
-        data = json.load(fh)
-    if isinstance(data, dict) and "findings" in data:
-        findings = data["findings"]
-    elif isinstance(data, list):
-        findings = data
-    else:
-        print("Unsupported input format")
-        return 2
-
-    assigned = engine.assign_all(findings, rules)
-    if args.output:
-        with open(args.output, "w", encoding="utf-8") as fh:
-            json.dump(assigned, fh, indent=2)
-        print(f"Wrote assignments to {args.output}")
-    else:
-        print(json.dumps(assigned, indent=2))
+    with open(args.input, "rb") as fh:
+        try:
+            assigned = engine.iter_assign(engine.iter_findings(fh), rules)
+            if args.output:
+                engine.write_assignments_file(Path(args.output), assigned)
+                print(f"Wrote assignments to {args.output}")
+            else:
+                engine.write_assignments(sys.stdout, assigned)
+                print()
+        except engine.INPUT_ERRORS as exc:
+            print(exc)
+            return 2
     return 0
 
 
@@ -19,6 +19,7 @@ from __future__ import annotations
 import argparse
 import csv
 import datetime
+import hashlib
 import json
 import re
 import sys
@@ -32,7 +33,12 @@ except Exception:
     print("PyYAML is required. Install with: pip install pyyaml", file=sys.stderr)
     raise
 
-STOP_WORDS = {
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
+STOP_WORDS = frozenset({
     "the",
     "and",
     "or",
@@ -47,17 +53,32 @@ STOP_WORDS = {
     "an",
     "by",
     "v",
-}
+})
+
+# ASCII characters outside [a-z0-9] become token separators (text is lowercased first)
+_SEPARATORS = str.maketrans({chr(c): " " for c in range(128) if not chr(c).isalnum()})
 
 
 def tokenize(text: str) -> List[str]:
     text = (text or "").lower()
     # split on non-alphanumeric, keep tokens with length >= 3
-    tokens = re.split(r"[^a-z0-9]+", text)
+    if text.isascii():
+        tokens = text.translate(_SEPARATORS).split()
+    else:
+        tokens = re.split(r"[^a-z0-9]+", text)
     tokens = [t for t in tokens if len(t) >= 3 and t not in STOP_WORDS]
     return tokens
 
 
+def _majority(counts: Dict[str, int]) -> Tuple[str, int]:
+    """Most frequent key and its count; ties go to the first key seen."""
+    best, best_count = "", -1
+    for key, count in counts.items():
+        if count > best_count:
+            best, best_count = key, count
+    return best, best_count
+
+
 def load_csv(path: Path) -> List[Dict[str, str]]:
     rows = []
     with path.open("r", encoding="utf-8") as f:
@@ -105,7 +126,7 @@ def build_rules(records: List[Dict[str, str]], min_keyword_support: int = 2) ->
         if not teams:
             continue
         c = Counter(teams)
-        team, count = c.most_common(1)[0]
+        team, count = _majority(c)
         if len(c) > 1 and count < sum(c.values()):
             plugin_conflicts.append({"plugin_id": pid, "teams": dict(c)})
         plugin_id_rules.append({
@@ -120,8 +141,10 @@ def build_rules(records: List[Dict[str, str]], min_keyword_support: int = 2) ->
         teams = [t for t in teams if t]
         if not teams:
             continue
-        team, _ = Counter(teams).most_common(1)[0]
-        family_rules.append({"id": f"fam-{abs(hash(fam))%100000}", "family": fam, "owner_team": team})
+        team, _ = _majority(Counter(teams))
+        # stable across runs (unlike hash()) so regenerated YAML stays byte-identical
+        fam_id = hashlib.blake2s(fam.encode("utf-8"), digest_size=4).hexdigest()
+        family_rules.append({"id": f"fam-{fam_id}", "family": fam, "owner_team": team})
 
     # keyword_rules: tokens with support >= min_keyword_support and clear majority team
     keyword_rules = []
@@ -131,7 +154,7 @@ def build_rules(records: List[Dict[str, str]], min_keyword_support: int = 2) ->
         total = sum(c.values())
         if total < min_keyword_support:
             continue
-        team, count = c.most_common(1)[0]
+        team, count = _majority(c)
         # require at least 60% agreement
         if count / total >= 0.6:
             keyword_rules.append({
@@ -236,13 +259,13 @@ def main(argv: Optional[List[str]] = None) -> int:
         mpath = Path(args.merge)
         if mpath.exists():
             with mpath.open("r", encoding="utf-8") as f:
-                existing = yaml.safe_load(f) or {}
+                existing = yaml.load(f, Loader=_Loader) or {}
             routing = merge_existing(existing, routing)
 
     outp = Path(args.output)
     outp.parent.mkdir(parents=True, exist_ok=True)
-    with outp.open("w", encoding="utf-8") as f:
-        yaml.safe_dump(routing, f, sort_keys=False, default_flow_style=False)
+    with outp.open("w", encoding="utf-8", buffering=1 << 20) as f:
+        yaml.dump(routing, f, Dumper=_Dumper, sort_keys=False, default_flow_style=False)
 
     print(f"Wrote routing rules to {outp}")
     return 0